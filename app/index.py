@@ -1,72 +1,185 @@
+import heapq
+import math
 import re
+import threading
 import time
-from typing import Dict, List, Set, Tuple, Optional
-from collections import defaultdict
+from typing import (
+    Any, Counter as CounterType, Dict, Iterator, List, Set, Tuple, Optional
+)
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import filterfalse
+from operator import itemgetter
+from sys import intern
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Word-character runs; compiled once and shared by every tokenize call
+_TOKEN_RE = re.compile(r"\w+")
+
+# Number of leading content characters kept as a search result snippet
+SNIPPET_LENGTH = 200
+
+# Common words excluded from the index
+_STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'
+})
+
+
+def _tokenize(text: str) -> List[str]:
+    """
+    Tokenize text into individual lowercase terms.
+    
+    A single regex scan extracts word-character runs, so punctuation is
+    dropped without building an intermediate normalized string. Stop words
+    are filtered by `filterfalse` over the frozenset's own membership test,
+    keeping the whole pipeline in C with no per-token bytecode.
+    
+    Args:
+        text: Input text to tokenize
+        
+    Returns:
+        List of tokens
+    """
+    # Lowering the whole text once is cheaper than lowering every token: the
+    # copy is bounded by the upload size limit, while per-token str.lower
+    # calls cost more CPU than the allocation they save
+    return list(filterfalse(_STOP_WORDS.__contains__, _TOKEN_RE.findall(text.lower())))
+
+
+def _make_snippet(content: str) -> str:
+    """
+    Build the search result snippet for a document.
+    
+    Args:
+        content: Document text content
+        
+    Returns:
+        The first SNIPPET_LENGTH characters, with an ellipsis if truncated
+    """
+    if len(content) > SNIPPET_LENGTH:
+        return content[:SNIPPET_LENGTH] + "..."
+    return content
+
+
+@lru_cache(maxsize=4096)
+def _tokenize_query(query: str) -> Tuple[str, ...]:
+    """
+    Tokenize a search query, memoizing the result for repeated queries.
+    
+    Document content is tokenized through the uncached `_tokenize` so large
+    bodies are never retained by the cache. Tokens are interned so index
+    lookups can match keys by identity.
+    
+    Args:
+        query: Search query string
+        
+    Returns:
+        Tuple of query tokens
+    """
+    return tuple(map(intern, _tokenize(query)))
+
+
+class ReadWriteLock:
+    """
+    Lock allowing any number of concurrent readers or a single writer.
+    
+    Waiting writers block new readers, so a steady stream of searches cannot
+    starve index updates. The lock is not reentrant.
+    """
+    
+    def __init__(self) -> None:
+        """Initialize an unlocked lock."""
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+    
+    @contextmanager
+    def reader(self) -> Iterator[None]:
+        """Hold the lock in shared mode for the duration of the block."""
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+    
+    @contextmanager
+    def writer(self) -> Iterator[None]:
+        """Hold the lock exclusively for the duration of the block."""
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
 
 class InvertedIndex:
     """
     Professional implementation of an inverted index for document search.
     
     This class provides efficient indexing and searching capabilities using
-    term frequency-based ranking and document metadata storage.
+    TF-IDF ranking and document metadata storage. Searches may run
+    concurrently; mutations are serialized behind a read-write lock.
     """
     
-    def __init__(self):
+    def __init__(self) -> None:
         """Initialize an empty inverted index."""
-        self.index: Dict[str, Dict[str, int]] = defaultdict(dict)
-        self.documents: Dict[str, Dict] = {}
-        self.term_stats: Dict[str, int] = defaultdict(int)  # Document frequency per term
-        self.total_documents = 0
-        self.total_terms = 0
+        # term -> {doc_id: tf}
+        self.index: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self.documents: Dict[str, Dict[str, Any]] = {}  # Metadata read while searching
+        self.contents: Dict[str, str] = {}  # Full text, kept apart from the search path
+        self.term_stats: CounterType[str] = Counter()  # Document frequency per term
+        self.doc_terms: Dict[str, List[str]] = {}  # doc_id -> its unique terms
+        self.total_documents: int = 0
+        self.total_terms: int = 0
+        self.total_postings: int = 0  # Number of (term, document) pairs
+        self.generation: int = 0  # Bumped on every mutation
+        self._idf_cache: Dict[str, float] = {}  # Invalidated on every mutation
+        self._most_common_terms: Optional[List[Tuple[str, int]]] = None
+        self.lock = ReadWriteLock()
         
-    def _normalize_text(self, text: str) -> str:
-        """
-        Normalize text by converting to lowercase and removing special characters.
-        
-        Args:
-            text: Input text to normalize
-            
-        Returns:
-            Normalized text
-        """
-        # Convert to lowercase and remove special characters except spaces
-        normalized = re.sub(r'[^\w\s]', '', text.lower())
-        return normalized
+    def _invalidate_caches(self) -> None:
+        """Record a modification and drop values derived from the index."""
+        self.generation += 1
+        self._idf_cache.clear()
+        self._most_common_terms = None
     
-    def _tokenize(self, text: str) -> List[str]:
+    def _calculate_idf(self, term: str) -> float:
         """
-        Tokenize text into individual terms.
+        Calculate the smoothed inverse document frequency of a term.
         
-        Args:
-            text: Input text to tokenize
-            
-        Returns:
-            List of tokens
-        """
-        normalized = self._normalize_text(text)
-        tokens = normalized.split()
-        # Filter out empty tokens and common stop words
-        stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'}
-        return [token for token in tokens if token and token not in stop_words]
-    
-    def _calculate_tf(self, term_count: int, total_terms: int) -> float:
-        """
-        Calculate term frequency score.
+        Uses log(1 + N / df) so terms present in every document still
+        contribute a positive weight. Results are cached until the index
+        is next modified.
         
         Args:
-            term_count: Number of occurrences of the term
-            total_terms: Total number of terms in the document
+            term: Indexed term
             
         Returns:
-            Term frequency score
+            Inverse document frequency score, or 0.0 for unknown terms
         """
-        if total_terms == 0:
-            return 0.0
-        return term_count / total_terms
+        idf = self._idf_cache.get(term)
+        if idf is None:
+            doc_freq = self.term_stats.get(term, 0)
+            idf = math.log(1 + self.total_documents / doc_freq) if doc_freq else 0.0
+            self._idf_cache[term] = idf
+        return idf
     
     def add_document(self, doc_id: str, content: str, title: Optional[str] = None, 
                     author: Optional[str] = None) -> bool:
@@ -82,48 +195,58 @@ class InvertedIndex:
         Returns:
             True if document was added successfully, False otherwise
         """
-        try:
-            if not content.strip():
-                logger.warning(f"Empty content for document {doc_id}")
-                return False
-                
-            # Tokenize the content
-            tokens = self._tokenize(content)
-            if not tokens:
-                logger.warning(f"No valid tokens found for document {doc_id}")
+        if not content.strip():
+            logger.warning(f"Empty content for document {doc_id}")
+            return False
+            
+        # Tokenize the content before taking the lock
+        tokens = _tokenize(content)
+        if not tokens:
+            logger.warning(f"No valid tokens found for document {doc_id}")
+            return False
+        
+        # Count term frequencies and intern each unique term, so postings,
+        # statistics and interned query tokens share one string object
+        term_counts = Counter(tokens)
+        terms = list(map(intern, term_counts))
+        
+        with self.lock.writer():
+            if doc_id in self.documents:
+                logger.warning(f"Document {doc_id} is already indexed")
                 return False
             
-            # Count term frequencies
-            term_counts = defaultdict(int)
-            for token in tokens:
-                term_counts[token] += 1
+            # Update the inverted index with normalized term frequencies
+            index = self.index
+            inv_total = 1.0 / len(tokens)
+            for term, count in zip(terms, term_counts.values()):
+                index[term][doc_id] = count * inv_total
             
-            # Update the inverted index
-            for term, count in term_counts.items():
-                self.index[term][doc_id] = count
-                self.term_stats[term] += 1
+            # Each unique term gains one document; Counter.update counts in C
+            self.term_stats.update(terms)
+            self.doc_terms[doc_id] = terms
             
-            # Store document metadata
+            # Store document metadata and content
+            self.contents[doc_id] = content
             self.documents[doc_id] = {
-                'content': content,
                 'title': title or f"Document {doc_id}",
                 'author': author,
                 'total_terms': len(tokens),
                 'unique_terms': len(term_counts),
+                'snippet': _make_snippet(content),
                 'added_at': time.time()
             }
             
             self.total_documents += 1
             self.total_terms = len(self.index)
-            
-            logger.info(f"Successfully indexed document {doc_id} with {len(tokens)} tokens")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error indexing document {doc_id}: {str(e)}")
-            return False
+            self.total_postings += len(term_counts)
+            self._invalidate_caches()
+        
+        logger.info(f"Successfully indexed document {doc_id} with {len(tokens)} tokens")
+        return True
     
-    def search(self, query: str, limit: int = 10) -> List[Tuple[str, float, Dict]]:
+    def search(
+        self, query: str, limit: int = 10
+    ) -> List[Tuple[str, float, Dict[str, Any]]]:
         """
         Search for documents containing the query terms.
         
@@ -136,47 +259,43 @@ class InvertedIndex:
         """
         start_time = time.time()
         
-        try:
-            # Tokenize the query
-            query_tokens = self._tokenize(query)
-            if not query_tokens:
-                return []
-            
+        # Tokenize the query
+        query_tokens = _tokenize_query(query)
+        if not query_tokens:
+            return []
+        
+        with self.lock.reader():
             # Find documents containing any of the query terms
-            doc_scores = defaultdict(float)
-            matching_docs = set()
-            
-            for token in query_tokens:
-                if token in self.index:
-                    for doc_id, term_freq in self.index[token].items():
-                        matching_docs.add(doc_id)
-                        # Calculate TF score for this term in this document
-                        doc_metadata = self.documents.get(doc_id, {})
-                        total_terms = doc_metadata.get('total_terms', 1)
-                        tf_score = self._calculate_tf(term_freq, total_terms)
-                        doc_scores[doc_id] += tf_score
-            
-            # Sort results by score (descending)
-            results = []
-            for doc_id in matching_docs:
-                score = doc_scores[doc_id]
-                metadata = self.documents.get(doc_id, {})
-                results.append((doc_id, score, metadata))
-            
-            # Sort by score and limit results
-            results.sort(key=lambda x: x[1], reverse=True)
-            results = results[:limit]
+            doc_scores: Dict[str, float] = {}
             
-            search_time = (time.time() - start_time) * 1000  # Convert to milliseconds
-            logger.info(f"Search completed in {search_time:.2f}ms, found {len(results)} results")
+            # Bind lookups to locals; they run once per query term and per result
+            postings_get = self.index.get
+            docs_get = self.documents.get
+            scores_get = doc_scores.get
             
-            return results
+            # Walk each distinct term's posting list once, weighting it by how
+            # often the term occurs in the query
+            for token, query_count in Counter(query_tokens).items():
+                postings = postings_get(token)
+                if not postings:
+                    continue
+                weight = self._calculate_idf(token) * query_count
+                for doc_id, tf in postings.items():
+                    doc_scores[doc_id] = scores_get(doc_id, 0.0) + tf * weight
             
-        except Exception as e:
-            logger.error(f"Error during search: {str(e)}")
-            return []
+            # Select the highest-scoring documents without sorting every match
+            top = heapq.nlargest(limit, doc_scores.items(), key=itemgetter(1))
+            results = [
+                (doc_id, score, docs_get(doc_id, {}))
+                for doc_id, score in top
+            ]
+        
+        search_time = (time.time() - start_time) * 1000  # Convert to milliseconds
+        logger.info(f"Search completed in {search_time:.2f}ms, found {len(results)} results")
+        
+        return results
     
-    def get_document(self, doc_id: str) -> Optional[Dict]:
+    def get_document(self, doc_id: str) -> Optional[Dict[str, Any]]:
         """
         Retrieve a document by its ID.
         
@@ -184,9 +303,13 @@ class InvertedIndex:
             doc_id: Document identifier
             
         Returns:
-            Document metadata or None if not found
+            Document metadata including its content, or None if not found
         """
-        return self.documents.get(doc_id)
+        with self.lock.reader():
+            metadata = self.documents.get(doc_id)
+            if metadata is None:
+                return None
+            return {**metadata, 'content': self.contents.get(doc_id, '')}
     
     def remove_document(self, doc_id: str) -> bool:
         """
@@ -199,23 +322,29 @@ class InvertedIndex:
             True if document was removed successfully, False otherwise
         """
         try:
-            if doc_id not in self.documents:
-                return False
-            
-            # Remove document from index
-            for term in list(self.index.keys()):
-                if doc_id in self.index[term]:
-                    del self.index[term][doc_id]
+            with self.lock.writer():
+                if doc_id not in self.documents:
+                    return False
+                
+                # Remove the document's postings, visiting only its own terms
+                for term in self.doc_terms.pop(doc_id, ()):
+                    postings = self.index.get(term)
+                    if postings is None or postings.pop(doc_id, None) is None:
+                        continue
+                    self.term_stats[term] -= 1
+                    self.total_postings -= 1
                     # Remove term if no documents remain
-                    if not self.index[term]:
+                    if not postings:
                         del self.index[term]
                         del self.term_stats[term]
-            
-            # Remove document metadata
-            del self.documents[doc_id]
-            
-            self.total_documents -= 1
-            self.total_terms = len(self.index)
+                
+                # Remove document metadata and content
+                del self.documents[doc_id]
+                self.contents.pop(doc_id, None)
+                
+                self.total_documents -= 1
+                self.total_terms = len(self.index)
+                self._invalidate_caches()
             
             logger.info(f"Successfully removed document {doc_id}")
             return True
@@ -224,26 +353,33 @@ class InvertedIndex:
             logger.error(f"Error removing document {doc_id}: {str(e)}")
             return False
     
-    def get_stats(self) -> Dict:
+    def get_stats(self) -> Dict[str, Any]:
         """
         Get index statistics.
         
+        Counters are maintained incrementally and the most common terms are
+        cached until the next mutation, so repeated calls are cheap.
+        
         Returns:
             Dictionary containing index statistics
         """
-        return {
-            'total_documents': self.total_documents,
-            'total_terms': self.total_terms,
-            'total_document_occurrences': sum(len(docs) for docs in self.index.values()),
-            'average_terms_per_document': self.total_terms / max(self.total_documents, 1),
-            'most_common_terms': sorted(
-                self.term_stats.items(), 
-                key=lambda x: x[1], 
-                reverse=True
-            )[:10]
-        }
+        with self.lock.reader():
+            if self._most_common_terms is None:
+                self._most_common_terms = heapq.nlargest(
+                    10, self.term_stats.items(), key=itemgetter(1)
+                )
+            
+            return {
+                'total_documents': self.total_documents,
+                'total_terms': self.total_terms,
+                'total_document_occurrences': self.total_postings,
+                'average_terms_per_document': (
+                    self.total_terms / max(self.total_documents, 1)
+                ),
+                'most_common_terms': list(self._most_common_terms)
+            }
     
-    def get_sample_terms(self, limit: int = 20) -> Dict[str, Dict[str, int]]:
+    def get_sample_terms(self, limit: int = 20) -> Dict[str, Dict[str, float]]:
         """
         Get a sample of indexed terms for debugging and learning purposes.
         
@@ -251,20 +387,26 @@ class InvertedIndex:
             limit: Maximum number of terms to return
             
         Returns:
-            Dictionary of terms and their document frequencies
+            Dictionary of terms and their per-document term frequencies
         """
         sample = {}
-        for i, (term, docs) in enumerate(self.index.items()):
-            if i >= limit:
-                break
-            sample[term] = dict(docs)
+        with self.lock.reader():
+            for i, (term, docs) in enumerate(self.index.items()):
+                if i >= limit:
+                    break
+                sample[term] = dict(docs)
         return sample
     
     def clear(self) -> None:
         """Clear all data from the index."""
-        self.index.clear()
-        self.documents.clear()
-        self.term_stats.clear()
-        self.total_documents = 0
-        self.total_terms = 0
+        with self.lock.writer():
+            self.index.clear()
+            self.documents.clear()
+            self.contents.clear()
+            self.term_stats.clear()
+            self.doc_terms.clear()
+            self.total_documents = 0
+            self.total_terms = 0
+            self.total_postings = 0
+            self._invalidate_caches()
         logger.info("Index cleared") 
\ No newline at end of file
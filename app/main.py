@@ -1,9 +1,11 @@
+import asyncio
 import time
 import logging
 from typing import Optional
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException, Query, Depends
+from fastapi import FastAPI, HTTPException, Query, Depends, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import uvicorn
@@ -27,6 +29,9 @@ index: Optional[InvertedIndex] = None
 storage: Optional[IndexStorage] = None
 start_time = time.time()
 
+# Serializes snapshot writes; concurrent saves would share one temp file
+snapshot_lock = asyncio.Lock()
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -36,7 +41,7 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting Inverted Index Search API...")
     storage = IndexStorage()
-    index = storage.load_index()
+    index = await run_in_threadpool(storage.load_index)
     if index is None:
         index = InvertedIndex()
         logger.info("Created new inverted index")
@@ -47,7 +52,8 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down Inverted Index Search API...")
     if index and storage:
-        storage.save_index(index)
+        async with snapshot_lock:
+            await run_in_threadpool(storage.save_index, index)
         logger.info("Index saved successfully")
 
 
@@ -68,7 +74,7 @@ app = FastAPI(
     
     This API demonstrates core information retrieval concepts:
     * Inverted index data structures
-    * Term frequency-based ranking
+    * TF-IDF relevance ranking
     * Document indexing and search algorithms
     * REST API design with FastAPI
     """,
@@ -108,6 +114,16 @@ def get_storage() -> IndexStorage:
     return storage
 
 
+async def save_snapshot(
+    index_instance: InvertedIndex, storage_instance: IndexStorage
+) -> None:
+    """Write a full index snapshot off the event loop as a background task."""
+    async with snapshot_lock:
+        saved = await run_in_threadpool(storage_instance.save_index, index_instance)
+    if not saved:
+        logger.warning("Failed to save index snapshot")
+
+
 @app.get("/", response_model=dict)
 async def root():
     """
@@ -130,6 +146,7 @@ async def root():
 @app.post("/upload", response_model=dict)
 async def upload_document(
     document: DocumentUpload,
+    background_tasks: BackgroundTasks,
     index_instance: InvertedIndex = Depends(get_index),
     storage_instance: IndexStorage = Depends(get_storage)
 ):
@@ -138,7 +155,8 @@ async def upload_document(
     
     This endpoint accepts a document with ID, content, and optional metadata,
     then indexes it for search. The document content is tokenized and stored
-    in the inverted index for efficient retrieval.
+    in the inverted index for efficient retrieval. Indexing runs in a worker
+    thread so concurrent searches are not blocked.
     """
     try:
         # Check if document already exists
@@ -148,8 +166,9 @@ async def upload_document(
                 detail=f"Document with ID '{document.doc_id}' already exists"
             )
         
-        # Add document to index
-        success = index_instance.add_document(
+        # Add document to index off the event loop
+        success = await run_in_threadpool(
+            index_instance.add_document,
             doc_id=document.doc_id,
             content=document.content,
             title=document.title,
@@ -162,14 +181,24 @@ async def upload_document(
                 detail="Failed to index document. Please check the content."
             )
         
-        # Save index to disk
-        if not storage_instance.save_index(index_instance):
-            logger.warning("Failed to save index after document upload")
+        # Journal the upload; the full snapshot is only rewritten periodically,
+        # after the response has been sent
+        metadata = index_instance.documents[document.doc_id]
+        journaled = await run_in_threadpool(
+            storage_instance.append_add,
+            document.doc_id,
+            document.content,
+            document.title,
+            document.author,
+            metadata['added_at']
+        )
+        if not journaled or storage_instance.needs_compaction():
+            background_tasks.add_task(save_snapshot, index_instance, storage_instance)
         
         return {
             "message": "Document uploaded successfully",
             "doc_id": document.doc_id,
-            "indexed_terms": index_instance.documents[document.doc_id]['unique_terms'],
+            "indexed_terms": metadata['unique_terms'],
             "total_documents": index_instance.total_documents
         }
         
@@ -189,7 +218,7 @@ async def search_documents(
     """
     Search for documents containing the specified query terms.
     
-    The search uses term frequency-based ranking to return the most relevant
+    The search uses TF-IDF ranking to return the most relevant
     documents first. Results are sorted by relevance score in descending order.
     """
     try:
@@ -206,16 +235,12 @@ async def search_documents(
         # Format results
         search_results = []
         for doc_id, score, metadata in results:
-            # Create snippet (first 200 characters of content)
-            content = metadata.get('content', '')
-            snippet = content[:200] + "..." if len(content) > 200 else content
-            
             search_results.append(SearchResult(
                 doc_id=doc_id,
                 score=round(score, 4),
                 title=metadata.get('title'),
                 author=metadata.get('author'),
-                snippet=snippet
+                snippet=metadata.get('snippet')
             ))
         
         return SearchResponse(
@@ -305,6 +330,7 @@ async def health_check():
 @app.delete("/documents/{doc_id}")
 async def delete_document(
     doc_id: str,
+    background_tasks: BackgroundTasks,
     index_instance: InvertedIndex = Depends(get_index),
     storage_instance: IndexStorage = Depends(get_storage)
 ):
@@ -320,16 +346,18 @@ async def delete_document(
                 detail=f"Document with ID '{doc_id}' not found"
             )
         
-        success = index_instance.remove_document(doc_id)
+        success = await run_in_threadpool(index_instance.remove_document, doc_id)
         if not success:
             raise HTTPException(
                 status_code=500,
                 detail="Failed to remove document"
             )
         
-        # Save index to disk
-        if not storage_instance.save_index(index_instance):
-            logger.warning("Failed to save index after document deletion")
+        # Journal the deletion; the full snapshot is only rewritten periodically,
+        # after the response has been sent
+        journaled = await run_in_threadpool(storage_instance.append_delete, doc_id)
+        if not journaled or storage_instance.needs_compaction():
+            background_tasks.add_task(save_snapshot, index_instance, storage_instance)
         
         return {
             "message": "Document deleted successfully",
@@ -387,7 +415,7 @@ async def http_exception_handler(request, exc):
         content=ErrorResponse(
             error=exc.detail,
             detail=f"HTTP {exc.status_code} error occurred"
-        ).dict()
+        ).model_dump(mode='json')
     )
 
 
@@ -400,7 +428,7 @@ async def general_exception_handler(request, exc):
         content=ErrorResponse(
             error="Internal server error",
             detail="An unexpected error occurred"
-        ).dict()
+        ).model_dump(mode='json')
     )
 
 
@@ -14,7 +14,7 @@ class DocumentUpload(BaseModel):
 class SearchResult(BaseModel):
     """Schema for individual search results."""
     doc_id: str = Field(..., description="Document identifier")
-    score: float = Field(..., description="Relevance score based on term frequency")
+    score: float = Field(..., description="TF-IDF relevance score")
     title: Optional[str] = Field(None, description="Document title")
     author: Optional[str] = Field(None, description="Document author")
     snippet: Optional[str] = Field(None, description="Text snippet containing search terms")
@@ -39,7 +39,7 @@ class IndexStats(BaseModel):
 class IndexResponse(BaseModel):
     """Schema for index view response."""
     stats: IndexStats = Field(..., description="Index statistics")
-    sample_terms: Dict[str, Dict[str, int]] = Field(..., description="Sample of indexed terms and their document frequencies")
+    sample_terms: Dict[str, Dict[str, float]] = Field(..., description="Sample of indexed terms and their per-document term frequencies")
 
 
 class ErrorResponse(BaseModel):
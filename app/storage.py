@@ -1,34 +1,163 @@
+import contextlib
+import gzip
+import mmap
 import pickle
 import os
 import shutil
+import struct
+import sys
+import threading
+import time
 import logging
+from collections import Counter, defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Dict, Any
-from datetime import datetime
+from typing import Optional, Dict, Any, BinaryIO, Deque, List, Tuple
 
 from .index import InvertedIndex
 
 logger = logging.getLogger(__name__)
 
+# Bumped whenever the layout of the saved index changes
+INDEX_FORMAT_VERSION = '1.4'
+
+# Length prefix written before every pickled journal record
+_RECORD_HEADER = struct.Struct('<I')
+
+# Journal appends reach the disk before returning; O_DSYNC is absent on Windows
+_JOURNAL_FLAGS = (
+    os.O_WRONLY | os.O_CREAT | os.O_APPEND
+    | getattr(os, 'O_DSYNC', 0) | getattr(os, 'O_BINARY', 0)
+)
+
+# Pinned so files stay readable by every supported interpreter
+_PICKLE_PROTOCOL = 5
+
+# Local timestamps are formatted by time.strftime, which runs in C
+_ISO_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+# Snapshots are gzip-compressed; files without this magic are raw pickles
+_GZIP_MAGIC = b'\x1f\x8b'
+
+# Pickled term strings compress several-fold even at the fastest level, which
+# costs less CPU than writing and backing up the uncompressed bytes
+_COMPRESS_LEVEL = 1
+
+# Uncompressed bytes per independently compressed gzip member
+_COMPRESS_BLOCK_SIZE = 4 * 1024 * 1024
+
+# Upper bounds on compression threads and on uncompressed bytes queued for them
+_COMPRESS_MAX_WORKERS = 4
+_COMPRESS_BACKLOG_BYTES = 16 * 1024 * 1024
+
+
+class _ParallelGzipWriter:
+    """
+    Write-only file object that gzip-compresses fixed-size blocks on threads.
+    
+    Each block becomes a separate gzip member; concatenated members are a
+    valid gzip stream, so readers need no special handling. zlib releases
+    the GIL while compressing, letting blocks compress on several cores
+    while pickle produces the next one. Once the queued blocks reach a
+    fixed byte budget, the oldest is written out before more are accepted,
+    so memory use does not grow with the snapshot or the core count.
+    """
+    
+    def __init__(self, fileobj: BinaryIO, level: int = _COMPRESS_LEVEL,
+                 block_size: int = _COMPRESS_BLOCK_SIZE):
+        """
+        Initialize the writer.
+        
+        Args:
+            fileobj: Binary file receiving the compressed stream
+            level: zlib compression level
+            block_size: Uncompressed bytes per gzip member
+        """
+        self._file = fileobj
+        self._level = level
+        self._block_size = block_size
+        self._buffer = bytearray()
+        self._max_pending = max(1, _COMPRESS_BACKLOG_BYTES // block_size)
+        workers = min(_COMPRESS_MAX_WORKERS, os.cpu_count() or 1)
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._pending: Deque[Future] = deque()
+    
+    def write(self, data: bytes) -> int:
+        """Buffer data, submitting each block for compression once it is full."""
+        view = memoryview(data)
+        while view:
+            room = self._block_size - len(self._buffer)
+            self._buffer += view[:room]
+            view = view[room:]
+            if len(self._buffer) >= self._block_size:
+                self._submit()
+        return len(data)
+    
+    def _submit(self) -> None:
+        """Queue the buffered block and write out any excess finished blocks."""
+        block = bytes(self._buffer)
+        self._buffer.clear()
+        self._pending.append(
+            self._executor.submit(gzip.compress, block, self._level, mtime=0)
+        )
+        while len(self._pending) > self._max_pending:
+            self._file.write(self._pending.popleft().result())
+    
+    def __enter__(self) -> '_ParallelGzipWriter':
+        return self
+    
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        """Flush remaining blocks in order, or drop them if the dump failed."""
+        try:
+            if exc_type is None:
+                if self._buffer:
+                    self._submit()
+                while self._pending:
+                    self._file.write(self._pending.popleft().result())
+        finally:
+            self._executor.shutdown(cancel_futures=True)
+
 
 class IndexStorage:
     """
     Handles persistence of the inverted index using pickle serialization.
     
     Provides save/load functionality with error handling, backup creation,
-    and automatic recovery mechanisms.
+    and automatic recovery mechanisms. Individual mutations are appended to
+    a journal so that the full snapshot only needs rewriting periodically.
     """
     
-    def __init__(self, data_dir: str = "data"):
+    def __init__(self, data_dir: str = "data", compact_every: int = 100,
+                 compact_interval: float = 300.0):
         """
         Initialize the storage manager.
         
         Args:
             data_dir: Directory to store index files
+            compact_every: Number of journaled operations after which a new
+                snapshot should be written
+            compact_interval: Seconds after which any journaled operations
+                should be folded into a new snapshot
         """
         self.data_dir = Path(data_dir)
         self.index_file = self.data_dir / "index.pkl"
+        self.journal_file = self.data_dir / "index.journal"
         self.backup_dir = self.data_dir / "backups"
+        self.compact_every = compact_every
+        self.compact_interval = compact_interval
+        self.pending_operations = 0
+        self.last_snapshot = time.monotonic()
+        
+        # Guards the journal file and pending_operations between appends and
+        # saves running in other threads
+        self._journal_lock = threading.Lock()
+        
+        # Index and generation last written to or read from the snapshot
+        self._saved_state: Optional[Tuple[InvertedIndex, int]] = None
+        
+        # Backup files, oldest first, and the directory mtime they reflect
+        self._backups: List[Path] = []
+        self._backups_mtime: Optional[int] = None
         
         # Ensure directories exist
         self.data_dir.mkdir(exist_ok=True)
@@ -40,6 +169,13 @@ class IndexStorage:
         """
         Save the inverted index to disk.
         
+        Writing a full snapshot also drops the journal records it now
+        contains. Writers wait while the snapshot is pickled and compressed,
+        but syncing it to disk and rotating backups happen after the index
+        lock is released. Saving an index
+        that has not changed since it was last saved or loaded is skipped,
+        so repeated saves do not rotate identical snapshots into backups.
+        
         Args:
             index: InvertedIndex instance to save
             
@@ -47,28 +183,61 @@ class IndexStorage:
             True if save was successful, False otherwise
         """
         try:
-            # Create backup of existing index if it exists
+            temp_file = self.index_file.with_suffix('.tmp')
+            with contextlib.ExitStack() as stack:
+                # Pickle straight into the compressor under the reader lock,
+                # so the uncompressed snapshot never sits in memory; syncing,
+                # backup rotation and the journal trim run after it is released
+                with index.lock.reader():
+                    if self._is_saved(index):
+                        logger.info(
+                            "Index unchanged since the last snapshot, skipping save"
+                        )
+                        return True
+                    
+                    generation = index.generation
+                    with self._journal_lock:
+                        journaled_bytes = self._journal_size()
+                        journaled_operations = self.pending_operations
+                    
+                    # Save to temporary file first
+                    f = stack.enter_context(open(temp_file, 'wb'))
+                    with _ParallelGzipWriter(f) as gz:
+                        # Live structures are pickled in their in-memory shape
+                        pickle.dump({
+                            'index': index.index,
+                            'documents': index.documents,
+                            'contents': index.contents,
+                            'term_stats': index.term_stats,
+                            'doc_terms': index.doc_terms,
+                            'total_documents': index.total_documents,
+                            'total_terms': index.total_terms,
+                            'saved_at': time.strftime(_ISO_FORMAT),
+                            'version': INDEX_FORMAT_VERSION
+                        }, gz, protocol=_PICKLE_PROTOCOL)
+                
+                # The rename below is only atomic across a crash if the
+                # data reached the disk first. The snapshot is not read
+                # again until restart, so its pages are dropped from the
+                # cache instead of evicting ones used by searches
+                f.flush()
+                os.fsync(f.fileno())
+                if hasattr(os, 'posix_fadvise'):
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+            
+            # Rotate the previous snapshot into the backups only once the
+            # new one is fully written, so a failed save leaves no
+            # redundant backup behind. Backups are hard links, so the
+            # current index file exists throughout the rotation
             if self.index_file.exists():
                 self._create_backup()
             
-            # Prepare data for serialization
-            index_data = {
-                'index': dict(index.index),
-                'documents': index.documents,
-                'term_stats': dict(index.term_stats),
-                'total_documents': index.total_documents,
-                'total_terms': index.total_terms,
-                'saved_at': datetime.now().isoformat(),
-                'version': '1.0'
-            }
-            
-            # Save to temporary file first
-            temp_file = self.index_file.with_suffix('.tmp')
-            with open(temp_file, 'wb') as f:
-                pickle.dump(index_data, f, protocol=pickle.HIGHEST_PROTOCOL)
-            
-            # Atomic move to final location
+            # Atomic move to final location, then drop only the journal
+            # records the snapshot contains; later ones must survive
             temp_file.replace(self.index_file)
+            self._sync_data_dir()
+            self._trim_journal(journaled_bytes, journaled_operations)
+            self._saved_state = (index, generation)
             
             logger.info(f"Index saved successfully to {self.index_file}")
             return True
@@ -85,36 +254,313 @@ class IndexStorage:
         """
         Load the inverted index from disk.
         
+        The whole snapshot is materialized up front rather than faulted in
+        per term: it is compressed, so there is no on-disk layout to map
+        lazily, and journal replay and the first search both need the
+        postings and term statistics anyway.
+        
         Returns:
             InvertedIndex instance if successful, None otherwise
         """
         try:
-            if not self.index_file.exists():
+            if self.index_file.exists():
+                index = self._build_index(self._read_snapshot(self.index_file))
+                # Restored verbatim at generation 0; re-indexing an older
+                # format or replaying the journal moves past it
+                self._saved_state = (index, 0)
+                logger.info(f"Index loaded successfully from {self.index_file}")
+            else:
                 logger.info("No existing index found, creating new one")
-                return InvertedIndex()
+                index = InvertedIndex()
             
-            with open(self.index_file, 'rb') as f:
-                index_data = pickle.load(f)
+        except Exception as e:
+            logger.error(f"Error loading index: {str(e)}")
+            # Try to restore from backup
+            restored = self._restore_from_backup()
+            if restored is None:
+                return None
+            index = restored
+        
+        # Re-apply operations recorded since the last snapshot. After a
+        # restore only those are recovered; anything the lost snapshot held
+        # was already trimmed from the journal
+        try:
+            replayed = self._replay_journal(index)
+        except OSError as e:
+            logger.error(f"Error replaying journal: {str(e)}")
+        else:
+            if replayed:
+                logger.info(f"Replayed {replayed} journaled operations")
+        
+        logger.info(
+            f"Loaded {index.total_documents} documents with {index.total_terms} terms"
+        )
+        
+        return index
+    
+    def append_add(self, doc_id: str, content: str, title: Optional[str],
+                   author: Optional[str], added_at: float) -> bool:
+        """
+        Record an added document in the journal.
+        
+        Args:
+            doc_id: Document identifier
+            content: Document text content
+            title: Optional document title
+            author: Optional document author
+            added_at: Time the document was indexed
             
-            # Create new index instance
-            index = InvertedIndex()
+        Returns:
+            True if the record was written, False otherwise
+        """
+        return self._append_record(('add', doc_id, content, title, author, added_at))
+    
+    def append_delete(self, doc_id: str) -> bool:
+        """
+        Record a removed document in the journal.
+        
+        Args:
+            doc_id: Document identifier
             
-            # Restore index data
-            index.index = index_data['index']
-            index.documents = index_data['documents']
-            index.term_stats = index_data['term_stats']
-            index.total_documents = index_data['total_documents']
-            index.total_terms = index_data['total_terms']
+        Returns:
+            True if the record was written, False otherwise
+        """
+        return self._append_record(('delete', doc_id))
+    
+    def needs_compaction(self) -> bool:
+        """
+        Check whether the journal should be folded into a new snapshot.
+        
+        A snapshot is due once enough operations have been journaled, or
+        once any have been waiting longer than the compaction interval, so
+        a slow trickle of updates does not grow the replay time unbounded.
+        
+        Returns:
+            True if save_index should be called
+        """
+        if self.pending_operations >= self.compact_every:
+            return True
+        waited = time.monotonic() - self.last_snapshot
+        return bool(self.pending_operations) and waited >= self.compact_interval
+    
+    def _append_record(self, record: tuple) -> bool:
+        """
+        Append a length-prefixed pickled record to the journal.
+        
+        Args:
+            record: Operation tuple to persist
             
-            logger.info(f"Index loaded successfully from {self.index_file}")
-            logger.info(f"Loaded {index.total_documents} documents with {index.total_terms} terms")
+        Returns:
+            True if the record was written, False otherwise
+        """
+        try:
+            payload = pickle.dumps(record, protocol=_PICKLE_PROTOCOL)
             
-            return index
+            # Callers acknowledge the operation once this returns, so the
+            # record is written synchronously in a single append
+            with self._journal_lock:
+                fd = os.open(self.journal_file, _JOURNAL_FLAGS, 0o644)
+                try:
+                    os.write(fd, _RECORD_HEADER.pack(len(payload)) + payload)
+                finally:
+                    os.close(fd)
+                
+                self.pending_operations += 1
+            return True
             
         except Exception as e:
-            logger.error(f"Error loading index: {str(e)}")
-            # Try to restore from backup
-            return self._restore_from_backup()
+            logger.error(f"Error appending to journal: {str(e)}")
+            return False
+    
+    def _replay_journal(self, index: InvertedIndex) -> int:
+        """
+        Apply journaled operations to an index loaded from the snapshot.
+        
+        Replay is idempotent, so operations already contained in the snapshot
+        are harmless. Replay stops at the first record that is empty, cut
+        short, unreadable or of an unexpected shape, as a crash can leave
+        behind, and that tail of the journal is discarded.
+        
+        Args:
+            index: Index to apply the operations to
+            
+        Returns:
+            Number of operations replayed
+        """
+        if not self.journal_file.exists():
+            self.pending_operations = 0
+            return 0
+        
+        with open(self.journal_file, 'rb') as f:
+            data = f.read()
+        
+        offset = 0
+        replayed = 0
+        while offset + _RECORD_HEADER.size <= len(data):
+            (length,) = _RECORD_HEADER.unpack_from(data, offset)
+            start = offset + _RECORD_HEADER.size
+            if not length or start + length > len(data):
+                break
+            try:
+                record = pickle.loads(data[start:start + length])
+            except Exception:
+                break
+            
+            try:
+                if record[0] == 'add':
+                    _, doc_id, content, title, author, added_at = record
+                    added = doc_id not in index.documents and index.add_document(
+                        doc_id, content, title=title, author=author
+                    )
+                    if added:
+                        index.documents[doc_id]['added_at'] = added_at
+                elif record[0] == 'delete':
+                    index.remove_document(record[1])
+            except (ValueError, TypeError, IndexError):
+                break
+            offset = start + length
+            replayed += 1
+        
+        if offset < len(data):
+            logger.warning("Discarding damaged records at the end of the journal")
+            os.truncate(self.journal_file, offset)
+        
+        self.pending_operations = replayed
+        return replayed
+    
+    def _reset_journal(self) -> None:
+        """Remove the journal and forget its pending operations."""
+        with self._journal_lock:
+            self.journal_file.unlink(missing_ok=True)
+            self.pending_operations = 0
+            self.last_snapshot = time.monotonic()
+    
+    def _journal_size(self) -> int:
+        """Get the current journal length in bytes, or 0 if there is none."""
+        try:
+            return self.journal_file.stat().st_size
+        except FileNotFoundError:
+            return 0
+    
+    def _trim_journal(self, size: int, operations: int) -> None:
+        """
+        Drop journal records that have been folded into a snapshot.
+        
+        Records appended after the snapshot was taken are kept. Replay is
+        idempotent, so keeping a record the snapshot already holds is safe.
+        
+        Args:
+            size: Journal length in bytes when the snapshot was taken
+            operations: Number of pending operations at that time
+        """
+        with self._journal_lock:
+            if self._journal_size() <= size:
+                self.journal_file.unlink(missing_ok=True)
+            else:
+                with open(self.journal_file, 'rb') as f:
+                    f.seek(size)
+                    tail = f.read()
+                temp_journal = self.journal_file.with_suffix('.journal.tmp')
+                with open(temp_journal, 'wb') as f:
+                    f.write(tail)
+                    f.flush()
+                    os.fsync(f.fileno())
+                temp_journal.replace(self.journal_file)
+                self._sync_data_dir()
+            self.pending_operations = max(self.pending_operations - operations, 0)
+            self.last_snapshot = time.monotonic()
+    
+    def _is_saved(self, index: InvertedIndex) -> bool:
+        """Check whether the snapshot on disk already holds this index state."""
+        return (
+            self._saved_state is not None
+            and self._saved_state[0] is index
+            and self._saved_state[1] == index.generation
+            and not self.pending_operations
+            and self.index_file.exists()
+        )
+    
+    def _sync_data_dir(self) -> None:
+        """Flush the data directory so a completed rename survives a crash."""
+        # Directories cannot be opened for fsync on Windows
+        if not hasattr(os, 'O_DIRECTORY'):
+            return
+        fd = os.open(self.data_dir, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    
+    def _read_snapshot(self, path: Path) -> Dict[str, Any]:
+        """
+        Deserialize a snapshot file.
+        
+        Compressed snapshots are inflated and unpickled as a stream, so the
+        decompressed bytes never sit in memory at once. Files written before
+        compression was introduced are recognised by their missing gzip
+        header and unpickled straight from a read-only memory map.
+        
+        Args:
+            path: Snapshot or backup file to read
+            
+        Returns:
+            Dictionary produced by save_index
+        """
+        with open(path, 'rb') as f:
+            if f.read(len(_GZIP_MAGIC)) == _GZIP_MAGIC:
+                f.seek(0)
+                with gzip.GzipFile(fileobj=f) as gz:
+                    return pickle.load(gz)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return pickle.loads(mapped)
+    
+    def _build_index(self, index_data: Dict[str, Any]) -> InvertedIndex:
+        """
+        Create an InvertedIndex from deserialized index data.
+        
+        Data saved by an older format version is re-indexed from the stored
+        document content rather than restored verbatim.
+        
+        Args:
+            index_data: Dictionary produced by save_index
+            
+        Returns:
+            Restored InvertedIndex instance
+        """
+        index = InvertedIndex()
+        
+        if index_data.get('version') != INDEX_FORMAT_VERSION:
+            logger.info(
+                "Re-indexing documents saved with format version "
+                f"{index_data.get('version')}"
+            )
+            contents = index_data.get('contents', {})
+            for doc_id, doc in index_data['documents'].items():
+                content = contents.get(doc_id, doc.get('content', ''))
+                if index.add_document(doc_id, content, title=doc.get('title'),
+                                      author=doc.get('author')):
+                    metadata = index.documents[doc_id]
+                    metadata['added_at'] = doc.get('added_at', metadata['added_at'])
+            return index
+        
+        # Restore index data, rewrapping mappings so new terms can be added
+        # and interning terms as add_document does
+        index.index = defaultdict(dict, (
+            (sys.intern(term), postings)
+            for term, postings in index_data['index'].items()
+        ))
+        index.documents = index_data['documents']
+        index.contents = index_data['contents']
+        index.term_stats = Counter({
+            sys.intern(term): count
+            for term, count in index_data['term_stats'].items()
+        })
+        index.doc_terms = index_data['doc_terms']
+        index.total_documents = index_data['total_documents']
+        index.total_terms = index_data['total_terms']
+        index.total_postings = sum(len(terms) for terms in index.doc_terms.values())
+        
+        return index
     
     def _create_backup(self) -> bool:
         """
@@ -124,10 +570,20 @@ class IndexStorage:
             True if backup was created successfully, False otherwise
         """
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = time.strftime("%Y%m%d_%H%M%S")
             backup_file = self.backup_dir / f"index_backup_{timestamp}.pkl"
             
-            shutil.copy2(self.index_file, backup_file)
+            # A hard link costs no data I/O. It stays a valid backup because
+            # save_index replaces the index file by renaming a new one over
+            # it, leaving the linked inode untouched
+            backups = self._list_backups()
+            try:
+                os.link(self.index_file, backup_file)
+            except OSError:
+                shutil.copy2(self.index_file, backup_file)
+            if backup_file not in backups:
+                backups.append(backup_file)
+            self._backups_mtime = self.backup_dir.stat().st_mtime_ns
             
             # Keep only the last 5 backups
             self._cleanup_old_backups()
@@ -147,28 +603,17 @@ class IndexStorage:
             InvertedIndex instance if successful, None otherwise
         """
         try:
-            backup_files = list(self.backup_dir.glob("index_backup_*.pkl"))
+            backup_files = self._list_backups()
             if not backup_files:
                 logger.warning("No backup files found")
                 return None
             
             # Get the most recent backup
-            latest_backup = max(backup_files, key=lambda f: f.stat().st_mtime)
+            latest_backup = backup_files[-1]
             
             logger.info(f"Attempting to restore from backup: {latest_backup}")
             
-            with open(latest_backup, 'rb') as f:
-                index_data = pickle.load(f)
-            
-            # Create new index instance
-            index = InvertedIndex()
-            
-            # Restore index data
-            index.index = index_data['index']
-            index.documents = index_data['documents']
-            index.term_stats = index_data['term_stats']
-            index.total_documents = index_data['total_documents']
-            index.total_terms = index_data['total_terms']
+            index = self._build_index(self._read_snapshot(latest_backup))
             
             logger.info(f"Successfully restored index from backup")
             return index
@@ -185,20 +630,46 @@ class IndexStorage:
             keep_count: Number of recent backups to keep
         """
         try:
-            backup_files = list(self.backup_dir.glob("index_backup_*.pkl"))
-            if len(backup_files) <= keep_count:
+            backup_files = self._list_backups()
+            excess = len(backup_files) - keep_count
+            if excess <= 0:
                 return
             
-            # Sort by modification time and remove old ones
-            backup_files.sort(key=lambda f: f.stat().st_mtime, reverse=True)
-            
-            for old_backup in backup_files[keep_count:]:
-                old_backup.unlink()
+            # The cached list is oldest first, so the excess is at the front
+            for old_backup in backup_files[:excess]:
+                old_backup.unlink(missing_ok=True)
                 logger.info(f"Removed old backup: {old_backup}")
+            del backup_files[:excess]
+            self._backups_mtime = self.backup_dir.stat().st_mtime_ns
                 
         except Exception as e:
             logger.error(f"Error cleaning up old backups: {str(e)}")
     
+    def _list_backups(self) -> List[Path]:
+        """
+        Get the backup files, oldest first.
+        
+        The directory is only rescanned when its mtime differs from the one
+        recorded after the last scan or change made here, so repeated saves
+        do not glob and stat every backup each time.
+        
+        Returns:
+            Cached list of backup paths, updated in place by callers
+        """
+        mtime = self.backup_dir.stat().st_mtime_ns
+        if mtime != self._backups_mtime:
+            # scandir yields names without fnmatch and caches each stat
+            with os.scandir(self.backup_dir) as it:
+                entries = [
+                    entry for entry in it
+                    if entry.name.startswith('index_backup_')
+                    and entry.name.endswith('.pkl')
+                ]
+            entries.sort(key=lambda entry: entry.stat().st_mtime)
+            self._backups = [Path(entry.path) for entry in entries]
+            self._backups_mtime = mtime
+        return self._backups
+    
     def get_index_info(self) -> Dict[str, Any]:
         """
         Get information about the stored index.
@@ -218,18 +689,18 @@ class IndexStorage:
             info.update({
                 'exists': True,
                 'size_mb': stat.st_size / (1024 * 1024),
-                'last_modified': datetime.fromtimestamp(stat.st_mtime).isoformat()
+                'last_modified': time.strftime(
+                    _ISO_FORMAT, time.localtime(stat.st_mtime)
+                )
             })
         
-        # Count backup files
-        backup_files = list(self.backup_dir.glob("index_backup_*.pkl"))
-        info['backup_count'] = len(backup_files)
+        info['backup_count'] = len(self._list_backups())
         
         return info
     
     def delete_index(self) -> bool:
         """
-        Delete the index file and all backups.
+        Delete the index file, its journal and all backups.
         
         Returns:
             True if deletion was successful, False otherwise
@@ -240,11 +711,15 @@ class IndexStorage:
                 self.index_file.unlink()
                 logger.info("Main index file deleted")
             
+            self._reset_journal()
+            
             # Delete all backup files
-            backup_files = list(self.backup_dir.glob("index_backup_*.pkl"))
+            backup_files = self._list_backups()
             for backup_file in backup_files:
-                backup_file.unlink()
+                backup_file.unlink(missing_ok=True)
                 logger.info(f"Backup file deleted: {backup_file}")
+            backup_files.clear()
+            self._backups_mtime = self.backup_dir.stat().st_mtime_ns
             
             return True
             
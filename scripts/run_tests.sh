@@ -124,7 +124,7 @@ if [ "$COVERAGE" = true ]; then
 fi
 
 if [ "$PARALLEL" = true ]; then
-    PYTEST_CMD="$PYTEST_CMD -n auto"
+    PYTEST_CMD="$PYTEST_CMD -n auto --dist loadgroup"
 fi
 
 # Add common options
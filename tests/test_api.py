@@ -1,23 +1,45 @@
+import asyncio
 import pytest
+import pytest_asyncio
 import httpx
-import tempfile
-import shutil
-from pathlib import Path
 
+from app import main
 from app.main import app
+from app.index import InvertedIndex
+from app.storage import IndexStorage
+
+
+@pytest.fixture(scope="session")
+def event_loop():
+    """Share one event loop so the app lifespan can span the whole session."""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest_asyncio.fixture(scope="session")
+async def client(tmp_path_factory):
+    """Run the app lifespan once and share an HTTP client across all tests."""
+    data_dir = tmp_path_factory.mktemp("data")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(main, "IndexStorage", lambda: IndexStorage(data_dir))
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                yield client
 
 
 class TestAPI:
     """Integration tests for the FastAPI endpoints."""
     
-    def setup_method(self):
-        """Set up test client and temporary directory."""
-        self.temp_dir = tempfile.mkdtemp()
-        self.client = httpx.AsyncClient(app=app, base_url="http://test")
-    
-    def teardown_method(self):
-        """Clean up after tests."""
-        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    @pytest.fixture(autouse=True)
+    def use_client(self, client, tmp_path):
+        """Expose the shared client and give each test an empty index."""
+        self.client = client
+        main.storage = IndexStorage(tmp_path)
+        main.index = InvertedIndex()
     
     @pytest.mark.asyncio
     async def test_root_endpoint(self):
@@ -85,6 +107,18 @@ class TestAPI:
             "content": ""
         }
         
+        response = await self.client.post("/upload", json=document_data)
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["loc"] == ["body", "content"]
+    
+    @pytest.mark.asyncio
+    async def test_upload_whitespace_content(self):
+        """Test uploading a document whose content has nothing to index."""
+        document_data = {
+            "doc_id": "test_doc_1",
+            "content": "   "
+        }
+        
         response = await self.client.post("/upload", json=document_data)
         assert response.status_code == 400
         assert "Failed to index document" in response.json()["error"]
@@ -111,8 +145,10 @@ class TestAPI:
             }
         ]
         
-        for doc in documents:
-            response = await self.client.post("/upload", json=doc)
+        responses = await asyncio.gather(*[
+            self.client.post("/upload", json=doc) for doc in documents
+        ])
+        for response in responses:
             assert response.status_code == 200
         
         # Search for "python"
@@ -181,20 +217,29 @@ class TestAPI:
     async def test_search_empty_query(self):
         """Test searching with empty query."""
         response = await self.client.get("/search?query=")
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["loc"] == ["query", "query"]
+    
+    @pytest.mark.asyncio
+    async def test_search_whitespace_query(self):
+        """Test searching with a whitespace-only query."""
+        response = await self.client.get("/search?query=%20%20")
         assert response.status_code == 400
         assert "Query cannot be empty" in response.json()["error"]
     
     @pytest.mark.asyncio
     async def test_search_with_limit(self):
         """Test searching with result limit."""
-        # Upload multiple documents
-        for i in range(5):
-            document_data = {
+        # Upload multiple documents concurrently
+        responses = await asyncio.gather(*[
+            self.client.post("/upload", json={
                 "doc_id": f"doc{i}",
                 "content": f"Document {i} about Python programming",
                 "title": f"Document {i}"
-            }
-            response = await self.client.post("/upload", json=document_data)
+            })
+            for i in range(5)
+        ])
+        for response in responses:
             assert response.status_code == 200
         
         # Search with limit
@@ -1,12 +1,41 @@
+import gzip
+import io
+import os
 import pytest
-import tempfile
-import shutil
+import pickle
+import threading
 from pathlib import Path
 
 from app.index import InvertedIndex
-from app.storage import IndexStorage
+from app.storage import IndexStorage, _ParallelGzipWriter
 
 
+# Small corpus shared by the search tests
+CORPUS = [
+    ("doc1", "Python is a programming language"),
+    ("doc2", "Java is also a programming language"),
+    ("doc3", "Python is popular for data science"),
+]
+
+
+@pytest.fixture(scope="session")
+def populated_index():
+    """Index CORPUS once for read-only tests; they must not modify it."""
+    index = InvertedIndex()
+    for doc_id, content in CORPUS:
+        index.add_document(doc_id, content)
+    return index
+
+
+@pytest.fixture(scope="session")
+def snapshot_bytes(populated_index, tmp_path_factory):
+    """Save populated_index once and return the snapshot file's contents."""
+    storage = IndexStorage(tmp_path_factory.mktemp("snapshot"))
+    assert storage.save_index(populated_index) is True
+    return storage.index_file.read_bytes()
+
+
+@pytest.mark.xdist_group("index_mem")
 class TestInvertedIndex:
     """Test cases for the InvertedIndex class."""
     
@@ -46,9 +75,10 @@ class TestInvertedIndex:
         assert doc['author'] == "John Doe"
         assert "Python is a programming language" in doc['content']
     
-    def test_add_document_with_empty_content(self):
-        """Test adding a document with empty content."""
-        success = self.index.add_document(doc_id="doc1", content="")
+    @pytest.mark.parametrize("content", ["", "   ", "\n\t", "the and of"])
+    def test_add_document_with_empty_content(self, content):
+        """Test adding a document with no indexable content."""
+        success = self.index.add_document(doc_id="doc1", content=content)
         assert success is False
         assert self.index.total_documents == 0
     
@@ -63,15 +93,10 @@ class TestInvertedIndex:
         assert "best" in self.index.index
         assert "language" in self.index.index
     
-    def test_search_single_term(self):
+    def test_search_single_term(self, populated_index):
         """Test searching for a single term."""
-        # Add test documents
-        self.index.add_document("doc1", "Python is a programming language")
-        self.index.add_document("doc2", "Java is also a programming language")
-        self.index.add_document("doc3", "Python is popular for data science")
-        
         # Search for "python"
-        results = self.index.search("python", limit=10)
+        results = populated_index.search("python", limit=10)
         
         assert len(results) == 2  # doc1 and doc3 contain "python"
         
@@ -84,33 +109,32 @@ class TestInvertedIndex:
         assert "doc1" in doc_ids
         assert "doc3" in doc_ids
     
-    def test_search_multiple_terms(self):
+    def test_search_multiple_terms(self, populated_index):
         """Test searching for multiple terms."""
-        # Add test documents
-        self.index.add_document("doc1", "Python programming language")
-        self.index.add_document("doc2", "Java programming language")
-        self.index.add_document("doc3", "Python data science")
-        
         # Search for "python programming"
-        results = self.index.search("python programming", limit=10)
+        results = populated_index.search("python programming", limit=10)
         
-        assert len(results) == 1  # Only doc1 contains both terms
+        assert len(results) == 3  # Terms are OR-ed; doc1 matches both
         assert results[0][0] == "doc1"
         assert results[0][1] > 0  # Score should be positive
     
-    def test_search_no_results(self):
-        """Test searching for terms that don't exist."""
-        self.index.add_document("doc1", "Python programming")
-        
-        results = self.index.search("javascript", limit=10)
-        assert len(results) == 0
+    @pytest.mark.parametrize("query,expected_count", [
+        ("python", 2),
+        ("PYTHON", 2),  # Search is case insensitive
+        ("Python", 2),
+        ("", 0),
+        ("javascript", 0),
+    ])
+    def test_search_cases(self, populated_index, query, expected_count):
+        """Test the number of matches for various queries."""
+        results = populated_index.search(query, limit=10)
+        assert len(results) == expected_count
     
-    def test_search_empty_query(self):
-        """Test searching with empty query."""
-        self.index.add_document("doc1", "Python programming")
-        
-        results = self.index.search("", limit=10)
-        assert len(results) == 0
+    @pytest.mark.parametrize("query", ["PYTHON", "Python"])
+    def test_search_case_variants(self, populated_index, query):
+        """Test that case variants of a query return identical results."""
+        expected = populated_index.search("python", limit=10)
+        assert populated_index.search(query, limit=10) == expected
     
     def test_remove_document(self):
         """Test removing a document from the index."""
@@ -128,6 +152,48 @@ class TestInvertedIndex:
         assert "python" not in self.index.index
         assert "programming" not in self.index.index
     
+    def test_add_duplicate_document(self):
+        """Test that re-adding an indexed document ID is rejected."""
+        self.index.add_document("doc1", "Python programming")
+        
+        assert self.index.add_document("doc1", "Java programming") is False
+        assert "java" not in self.index.index
+    
+    def test_concurrent_add_and_search(self):
+        """Test that searches can run while other threads add documents."""
+        errors = []
+        
+        def writer(start):
+            for i in range(start, start + 50):
+                if not self.index.add_document(f"doc{i}", f"Python document number{i}"):
+                    errors.append(i)
+        
+        def reader():
+            for _ in range(50):
+                self.index.search("python", limit=5)
+        
+        threads = [threading.Thread(target=writer, args=(n * 50,)) for n in range(4)]
+        threads += [threading.Thread(target=reader) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert errors == []
+        assert self.index.total_documents == 200
+        assert self.index.term_stats["python"] == 200
+    
+    def test_remove_document_updates_term_stats(self):
+        """Test that removing a document decrements shared term frequencies."""
+        self.index.add_document("doc1", "Python programming")
+        self.index.add_document("doc2", "Java programming")
+        
+        self.index.remove_document("doc1")
+        
+        assert self.index.term_stats["programming"] == 1
+        assert "python" not in self.index.term_stats
+        assert list(self.index.index["programming"]) == ["doc2"]
+    
     def test_remove_nonexistent_document(self):
         """Test removing a document that doesn't exist."""
         success = self.index.remove_document("nonexistent")
@@ -143,16 +209,20 @@ class TestInvertedIndex:
         
         assert stats['total_documents'] == 2
         assert stats['total_terms'] > 0
+        assert stats['total_document_occurrences'] == 4
         assert 'most_common_terms' in stats
         assert len(stats['most_common_terms']) <= 10
+        assert stats['most_common_terms'][0] == ("programming", 2)
+        
+        # Cached statistics must reflect later mutations
+        self.index.remove_document("doc1")
+        stats = self.index.get_stats()
+        assert stats['total_document_occurrences'] == 2
+        assert stats['most_common_terms'][0][1] == 1
     
-    def test_get_sample_terms(self):
+    def test_get_sample_terms(self, populated_index):
         """Test getting sample terms."""
-        # Add documents with many terms
-        self.index.add_document("doc1", "Python programming language data science")
-        self.index.add_document("doc2", "Java programming language web development")
-        
-        sample = self.index.get_sample_terms(limit=5)
+        sample = populated_index.get_sample_terms(limit=5)
         assert len(sample) <= 5
         
         # Check that sample contains actual terms
@@ -163,10 +233,10 @@ class TestInvertedIndex:
     def test_clear_index(self):
         """Test clearing the entire index."""
         # Add some documents
-        self.index.add_document("doc1", "Python programming")
-        self.index.add_document("doc2", "Java programming")
+        for doc_id, content in CORPUS:
+            self.index.add_document(doc_id, content)
         
-        assert self.index.total_documents == 2
+        assert self.index.total_documents == len(CORPUS)
         
         # Clear the index
         self.index.clear()
@@ -189,30 +259,28 @@ class TestInvertedIndex:
         # Score should reflect the high frequency of "python"
         assert results[0][1] > 0
     
-    def test_case_insensitive_search(self):
-        """Test that search is case insensitive."""
-        self.index.add_document("doc1", "Python programming")
+    def test_rare_terms_weigh_more(self):
+        """Test that inverse document frequency boosts rarer terms."""
+        self.index.add_document("doc1", "Python tutorial")
+        self.index.add_document("doc2", "Rust tutorial")
+        self.index.add_document("doc3", "Python guide")
         
-        # Search with different cases
-        results1 = self.index.search("python", limit=10)
-        results2 = self.index.search("PYTHON", limit=10)
-        results3 = self.index.search("Python", limit=10)
+        # "rust" appears in one document, "python" in two
+        results = self.index.search("python rust", limit=10)
         
-        assert len(results1) == len(results2) == len(results3) == 1
-        assert results1[0][0] == results2[0][0] == results3[0][0] == "doc1"
+        assert results[0][0] == "doc2"
+        assert results[0][1] > results[1][1]
 
 
+@pytest.mark.xdist_group("index_io")
 class TestIndexStorage:
     """Test cases for the IndexStorage class."""
     
-    def setup_method(self):
-        """Set up a temporary directory for each test."""
-        self.temp_dir = tempfile.mkdtemp()
-        self.storage = IndexStorage(self.temp_dir)
-    
-    def teardown_method(self):
-        """Clean up temporary directory after each test."""
-        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    @pytest.fixture(autouse=True)
+    def storage_dir(self, tmp_path):
+        """Give each test its own storage directory, removed by pytest."""
+        self.temp_dir = tmp_path
+        self.storage = IndexStorage(tmp_path)
     
     def test_save_and_load_index(self):
         """Test saving and loading an index."""
@@ -230,6 +298,7 @@ class TestIndexStorage:
         assert loaded_index is not None
         assert loaded_index.total_documents == 2
         assert loaded_index.total_terms > 0
+        assert loaded_index.total_postings == index.total_postings
         
         # Verify documents are preserved
         doc1 = loaded_index.get_document("doc1")
@@ -239,18 +308,222 @@ class TestIndexStorage:
         assert "Python programming" in doc1['content']
         assert "Java programming" in doc2['content']
     
+    def test_saved_index_is_compressed(self):
+        """Test that snapshots are written gzip-compressed."""
+        index = InvertedIndex()
+        index.add_document("doc1", "Python programming")
+        self.storage.save_index(index)
+        
+        with open(self.storage.index_file, 'rb') as f:
+            assert f.read(2) == b'\x1f\x8b'
+    
+    def test_compressed_blocks_round_trip(self):
+        """Test that block-wise compression produces one readable gzip stream."""
+        data = bytes(range(256)) * 1000
+        buffer = io.BytesIO()
+        with _ParallelGzipWriter(buffer, block_size=10000) as writer:
+            for start in range(0, len(data), 4096):
+                writer.write(data[start:start + 4096])
+        
+        assert gzip.decompress(buffer.getvalue()) == data
+        
+        # A single large write is still split into blocks
+        buffer = io.BytesIO()
+        with _ParallelGzipWriter(buffer, block_size=10000) as writer:
+            writer.write(data)
+        
+        assert gzip.decompress(buffer.getvalue()) == data
+        assert buffer.getvalue().count(b'\x1f\x8b\x08') >= len(data) // 10000
+    
+    def test_add_document_after_load(self):
+        """Test that a loaded index accepts documents with new terms."""
+        index = InvertedIndex()
+        index.add_document("doc1", "Python programming")
+        self.storage.save_index(index)
+        
+        loaded_index = self.storage.load_index()
+        assert loaded_index.add_document("doc2", "Rust systems") is True
+        assert loaded_index.term_stats["rust"] == 1
+        assert len(loaded_index.search("rust")) == 1
+    
+    def test_journal_replay(self):
+        """Test that journaled operations are replayed on top of the snapshot."""
+        index = InvertedIndex()
+        index.add_document("doc1", "Python programming")
+        self.storage.save_index(index)
+        
+        self.storage.append_add("doc2", "Java programming", "Java", None, 123.0)
+        self.storage.append_delete("doc1")
+        
+        loaded_index = IndexStorage(self.temp_dir).load_index()
+        assert loaded_index.get_document("doc1") is None
+        assert loaded_index.get_document("doc2")['title'] == "Java"
+        assert loaded_index.get_document("doc2")['added_at'] == 123.0
+    
+    def test_journal_truncated_record(self):
+        """Test that a partially written journal record is discarded."""
+        self.storage.append_add("doc1", "Python programming", None, None, 123.0)
+        with open(self.storage.journal_file, 'ab') as f:
+            f.write(b"\x10\x00\x00\x00partial")
+        
+        loaded_index = self.storage.load_index()
+        assert loaded_index.total_documents == 1
+        
+        # New records must be readable after the damaged tail was dropped
+        self.storage.append_add("doc2", "Java programming", None, None, 124.0)
+        assert IndexStorage(self.temp_dir).load_index().total_documents == 2
+    
+    def test_journal_zero_filled_tail(self):
+        """Test that a zero-filled journal tail keeps earlier records."""
+        index = InvertedIndex()
+        index.add_document("a", "Python programming")
+        index.add_document("b", "Java programming")
+        self.storage.save_index(index)
+        self.storage.append_add("c", "Rust programming", None, None, 123.0)
+        with open(self.storage.journal_file, 'ab') as f:
+            f.write(bytes(16))
+        
+        loaded_index = self.storage.load_index()
+        assert sorted(loaded_index.documents) == ["a", "b", "c"]
+        assert self.storage.pending_operations == 1
+    
+    def test_restored_backup_replays_journal(self):
+        """Test that later journal records are replayed onto a restored backup."""
+        index = InvertedIndex()
+        index.add_document("a", "Python programming")
+        self.storage.save_index(index)
+        index.add_document("b", "Java programming")
+        self.storage.save_index(index)
+        self.storage.append_add("c", "Rust programming", None, None, 123.0)
+        self.storage.index_file.write_bytes(b"corrupt")
+        
+        # "b" was only in the lost snapshot and already trimmed from the journal
+        loaded_index = self.storage.load_index()
+        assert sorted(loaded_index.documents) == ["a", "c"]
+    
+    def test_journal_malformed_record(self):
+        """Test that a record of an unexpected shape is treated as a torn tail."""
+        self.storage.append_add("doc1", "Python programming", None, None, 123.0)
+        self.storage._append_record(("add", "doc2"))
+        self.storage.append_delete("doc1")
+        
+        loaded_index = self.storage.load_index()
+        assert list(loaded_index.documents) == ["doc1"]
+        assert self.storage.pending_operations == 1
+    
+    def test_journal_read_error(self):
+        """Test that an unreadable journal does not abort loading the snapshot."""
+        index = InvertedIndex()
+        index.add_document("doc1", "Python programming")
+        self.storage.save_index(index)
+        self.storage.journal_file.mkdir()
+        
+        loaded_index = self.storage.load_index()
+        assert list(loaded_index.documents) == ["doc1"]
+    
+    def test_save_resets_journal(self):
+        """Test that writing a snapshot clears the journal."""
+        storage = IndexStorage(self.temp_dir, compact_every=2)
+        storage.append_delete("doc1")
+        assert storage.needs_compaction() is False
+        storage.append_delete("doc2")
+        assert storage.needs_compaction() is True
+        
+        storage.save_index(InvertedIndex())
+        assert storage.needs_compaction() is False
+        assert not storage.journal_file.exists()
+    
+    def test_save_keeps_later_journal_records(self):
+        """Test that only journal records taken into a snapshot are dropped."""
+        self.storage.append_add("doc1", "Python programming", None, None, 123.0)
+        size = self.storage.journal_file.stat().st_size
+        self.storage.append_add("doc2", "Java programming", None, None, 124.0)
+        
+        self.storage._trim_journal(size, 1)
+        
+        assert self.storage.pending_operations == 1
+        assert list(IndexStorage(self.temp_dir).load_index().documents) == ["doc2"]
+    
+    def test_save_releases_lock_before_backup(self, monkeypatch):
+        """Test that documents can be added while a snapshot is rotated in."""
+        index = InvertedIndex()
+        index.add_document("doc1", "Python programming")
+        self.storage.save_index(index)
+        index.add_document("doc2", "Java programming")
+        
+        added = []
+        create_backup = self.storage._create_backup
+        
+        def add_doc3():
+            added.append(index.add_document("doc3", "Rust programming"))
+        
+        def add_during_backup():
+            thread = threading.Thread(target=add_doc3)
+            thread.start()
+            thread.join(timeout=5)
+            return create_backup()
+        
+        monkeypatch.setattr(self.storage, "_create_backup", add_during_backup)
+        assert self.storage.save_index(index) is True
+        assert added == [True]
+        
+        # The snapshot predates doc3, so the index still needs saving
+        assert sorted(self.storage.load_index().documents) == ["doc1", "doc2"]
+        assert self.storage.save_index(index) is True
+        assert len(self.storage.load_index().documents) == 3
+    
+    def test_compaction_interval(self):
+        """Test that journaled operations are compacted once they grow stale."""
+        storage = IndexStorage(self.temp_dir, compact_interval=0)
+        assert storage.needs_compaction() is False
+        
+        storage.append_delete("doc1")
+        assert storage.needs_compaction() is True
+    
+    def test_load_restores_search_results(self, populated_index, snapshot_bytes):
+        """Test that a loaded snapshot ranks documents like the saved index."""
+        self.storage.index_file.write_bytes(snapshot_bytes)
+        
+        loaded_index = self.storage.load_index()
+        expected = populated_index.search("python data", limit=10)
+        assert loaded_index.search("python data", limit=10) == expected
+    
     def test_load_nonexistent_index(self):
         """Test loading when no index file exists."""
         loaded_index = self.storage.load_index()
         assert loaded_index is not None
         assert loaded_index.total_documents == 0
     
-    def test_get_index_info(self):
+    def test_load_legacy_format(self):
+        """Test that an index saved with raw term counts is re-indexed on load."""
+        legacy_data = {
+            'index': {'python': {'doc1': 1}, 'programming': {'doc1': 1}},
+            'documents': {
+                'doc1': {
+                    'content': 'Python programming',
+                    'title': 'Python',
+                    'author': None,
+                    'total_terms': 2,
+                    'unique_terms': 2,
+                    'added_at': 123.0
+                }
+            },
+            'term_stats': {'python': 1, 'programming': 1},
+            'total_documents': 1,
+            'total_terms': 2,
+            'version': '1.0'
+        }
+        with open(self.storage.index_file, 'wb') as f:
+            pickle.dump(legacy_data, f)
+        
+        loaded_index = self.storage.load_index()
+        assert loaded_index.total_documents == 1
+        assert loaded_index.index['python']['doc1'] == 0.5
+        assert loaded_index.get_document("doc1")['added_at'] == 123.0
+    
+    def test_get_index_info(self, snapshot_bytes):
         """Test getting index file information."""
-        # Create and save an index
-        index = InvertedIndex()
-        index.add_document("doc1", "Python programming")
-        self.storage.save_index(index)
+        self.storage.index_file.write_bytes(snapshot_bytes)
         
         info = self.storage.get_index_info()
         
@@ -261,24 +534,66 @@ class TestIndexStorage:
     
     def test_backup_creation(self):
         """Test that backups are created when saving."""
-        # Create and save an index
+        # Any existing index file is rotated into the backups on save
+        self.storage.index_file.write_bytes(b"sentinel")
+        
         index = InvertedIndex()
         index.add_document("doc1", "Python programming")
         self.storage.save_index(index)
         
-        # Save again to trigger backup creation
-        self.storage.save_index(index)
-        
         info = self.storage.get_index_info()
         assert info['backup_count'] > 0
+        backup_file, = self.storage.backup_dir.iterdir()
+        assert backup_file.read_bytes() == b"sentinel"
     
-    def test_delete_index(self):
-        """Test deleting the index."""
-        # Create and save an index
+    def test_unchanged_index_is_not_saved_again(self):
+        """Test that saving an unmodified index writes no new snapshot or backup."""
         index = InvertedIndex()
         index.add_document("doc1", "Python programming")
+        assert self.storage.save_index(index) is True
+        mtime = self.storage.index_file.stat().st_mtime_ns
+        
+        assert self.storage.save_index(index) is True
+        assert self.storage.index_file.stat().st_mtime_ns == mtime
+        assert self.storage.get_index_info()['backup_count'] == 0
+        
+        loaded_index = self.storage.load_index()
+        assert self.storage.save_index(loaded_index) is True
+        assert self.storage.get_index_info()['backup_count'] == 0
+    
+    def test_cleanup_keeps_newest_backups(self):
+        """Test that cleanup removes the oldest backups, including external ones."""
+        assert self.storage.get_index_info()['backup_count'] == 0
+        
+        for i in range(7):
+            backup_file = self.storage.backup_dir / f"index_backup_{i}.pkl"
+            backup_file.write_bytes(b"")
+            os.utime(backup_file, (1000 + i, 1000 + i))
+        
+        self.storage._cleanup_old_backups(keep_count=5)
+        
+        remaining = sorted(f.name for f in self.storage.backup_dir.iterdir())
+        assert remaining == [f"index_backup_{i}.pkl" for i in range(2, 7)]
+        assert self.storage.get_index_info()['backup_count'] == 5
+    
+    def test_backup_keeps_previous_snapshot(self):
+        """Test that a backup is unaffected by the save that follows it."""
+        index = InvertedIndex()
+        index.add_document("doc1", "Python programming")
+        self.storage.save_index(index)
+        
+        index.add_document("doc2", "Java programming")
         self.storage.save_index(index)
         
+        backup_file, = self.storage.backup_dir.glob("index_backup_*.pkl")
+        backup = self.storage._build_index(self.storage._read_snapshot(backup_file))
+        assert list(backup.documents) == ["doc1"]
+        assert self.storage.load_index().total_documents == 2
+    
+    def test_delete_index(self, snapshot_bytes):
+        """Test deleting the index."""
+        self.storage.index_file.write_bytes(snapshot_bytes)
+        
         # Verify index exists
         info = self.storage.get_index_info()
         assert info['exists'] is True